@@ -4,9 +4,16 @@
 使用本地 ANP 包进行独立验证
 """
 
+import atexit
+import io
 import json
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 添加父目录的 ANP 包到 Python 路径
@@ -21,6 +28,68 @@ except ImportError as e:
     print(f"   Tried to import from: {anp_root}")
     sys.exit(1)
 
+# 签名格式校验用的正则，模块加载时编译一次
+_B64URL_RE = re.compile(r'\A[A-Za-z0-9_-]+\Z')
+
+# 认证字段位掩码，必需字段检查只需一次与运算
+_FIELD_BITS = {"did": 1, "nonce": 2, "timestamp": 4, "signature": 8, "verification_method": 16}
+_REQUIRED_MASK = 1 | 2 | 4 | 8
+
+
+def _field_mask(fields) -> int:
+    mask = 0
+    for name in fields:
+        mask |= _FIELD_BITS.get(name, 0)
+    return mask
+
+
+def _parse_didwba(header: str) -> dict:
+    """解析 DIDWba 认证头：逗号分隔的 key="value" 列表，无需正则"""
+    body = header.removeprefix("DIDWba ")
+    fields = {}
+    for part in body.split(", "):
+        key, sep, value = part.partition("=")
+        if sep:
+            fields[key] = value.strip('"')
+    return fields
+
+
+def _run(cmd, cwd):
+    """运行命令并捕获原始 stdout（bytes）；stderr 不使用，直接丢弃"""
+    return subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+
+class _ThreadStdout:
+    """按线程重定向 stdout，使并发运行的验证输出互不穿插"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+    
+    def __getattr__(self, name):
+        # encoding、isatty()、fileno() 等其余属性透传给真实的 stdout
+        return getattr(self._stream, name)
+    
+    def run(self, name, test_func):
+        """运行单个验证，返回 (结果, 输出)"""
+        self._local.buffer = io.StringIO()
+        try:
+            result = bool(test_func())
+        except Exception as e:
+            print(f"❌ Test '{name}' failed with error: {e}")
+            result = False
+        finally:
+            output = self._local.buffer.getvalue()
+            self._local.buffer = None
+        return result, output
+
 
 class CrossVerifier:
     """跨语言验证器"""
@@ -32,31 +101,89 @@ class CrossVerifier:
         
         if not self.did_doc.exists() or not self.private_key.exists():
             raise FileNotFoundError("Test credentials not found")
+        
+        # DID 文档和私钥只加载一次，所有验证共享同一个认证器
+        with open(self.did_doc) as f:
+            self.py_doc = json.load(f)
+        self.py_auth = DIDWbaAuthHeader(
+            did_document_path=str(self.did_doc),
+            private_key_path=str(self.private_key),
+        )
+        
+        # 已生成的认证头，供不要求新 nonce 的验证复用
+        self._py_headers = {}
+        self._go_outputs = {}
+        self._key_locks = {}
+        self._key_locks_guard = threading.Lock()
+        
+        # 预先编译 Go 示例，避免每次验证都执行 go run
+        self._tmpdir = tempfile.mkdtemp(prefix="anp-cross-verify-")
+        atexit.register(shutil.rmtree, self._tmpdir, ignore_errors=True)
+        self.basic_header_bin = self._build("basic_header", "examples/identity/basic_header/main.go")
+        self.did_public_bin = self._build("did_public", "examples/did_public/main.go")
+    
+    def _build(self, name: str, source: str) -> str:
+        """编译 Go 程序到临时目录，返回可执行文件路径"""
+        binary = str(Path(self._tmpdir) / name)
+        subprocess.run(
+            ["go", "build", "-o", binary, source],
+            cwd=self.go_root,
+            check=True,
+        )
+        return binary
+    
+    def _cached(self, cache: dict, key, compute):
+        """按 key 加锁计算并缓存；只有等待同一 key 的调用者会互相阻塞"""
+        with self._key_locks_guard:
+            lock = self._key_locks.setdefault((id(cache), key), threading.Lock())
+        with lock:
+            if key not in cache:
+                cache[key] = compute()
+            return cache[key]
+    
+    def _generate_go(self, target: str, fmt: str):
+        result = _run(
+            [self.basic_header_bin,
+             "-target", target,
+             "-format", fmt],
+            self.go_root,
+        )
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode("utf-8", "replace")
+    
+    def _get_headers(self, target: str, fmt: str):
+        """返回 (Python 认证头, Go 输出)，同一 target/format 只生成一次；Go 失败时输出为 None"""
+        py_auth_value = self._cached(
+            self._py_headers, target,
+            lambda: self.py_auth.get_auth_header(target)["Authorization"],
+        )
+        go_output = self._cached(
+            self._go_outputs, (target, fmt),
+            lambda: self._generate_go(target, fmt),
+        )
+        return py_auth_value, go_output
     
     def verify_did_document(self):
         """验证 DID 文档在两种实现中都能正确加载"""
         print("\n==> Verifying DID Document")
         
         # Python 加载
-        with open(self.did_doc) as f:
-            py_doc = json.load(f)
-        
+        py_doc = self.py_doc
         py_did_id = py_doc['id']
         print(f"✓ Python loaded DID: {py_did_id}")
         
         # Go 加载（通过生成认证头来验证）
-        result = subprocess.run(
-            ["go", "run", "examples/did_public/main.go",
+        result = _run(
+            [self.did_public_bin,
              "-doc", str(self.did_doc),
              "-key", str(self.private_key),
              "-domain", "test.example.com",
              "-format", "header"],
-            cwd=self.go_root,
-            capture_output=True,
-            text=True
+            self.go_root,
         )
         
-        if result.returncode == 0 and "Authorization header:" in result.stdout:
+        if result.returncode == 0 and b"Authorization header:" in result.stdout:
             print("✓ Go loaded DID successfully")
         else:
             print("❌ Go failed to load DID")
@@ -70,31 +197,14 @@ class CrossVerifier:
         
         target = "https://test.example.com/api"
         
-        # Python 生成
-        py_auth = DIDWbaAuthHeader(
-            did_document_path=str(self.did_doc),
-            private_key_path=str(self.private_key),
-        )
-        py_header = py_auth.get_auth_header(target)
-        py_auth_value = py_header["Authorization"]
-        
+        py_auth_value, go_output = self._get_headers(target, "header")
         print(f"✓ Python generated: {py_auth_value[:50]}...")
         
-        # Go 生成
-        result = subprocess.run(
-            ["go", "run", "examples/identity/basic_header/main.go",
-             "-target", target,
-             "-format", "header"],
-            cwd=self.go_root,
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
+        if go_output is None:
             print("❌ Go generation failed")
             return False
         
-        go_auth_value = result.stdout.split("Authorization header:")[1].strip()
+        go_auth_value = go_output.split("Authorization header:")[1].strip()
         print(f"✓ Go generated: {go_auth_value[:50]}...")
         
         # 验证格式一致性（都应该是 DIDWba 格式）
@@ -121,45 +231,24 @@ class CrossVerifier:
         
         target = "https://test.example.com/api"
         
-        # Python 生成认证头并解析
-        py_auth = DIDWbaAuthHeader(
-            did_document_path=str(self.did_doc),
-            private_key_path=str(self.private_key),
-        )
-        py_header = py_auth.get_auth_header(target)
-        py_auth_value = py_header["Authorization"]
+        py_auth_value, go_output = self._get_headers(target, "json")
         
         # 从 header 中提取字段（DIDWba 格式）
-        import re
-        py_fields = re.findall(r'(\w+)="[^"]*"', py_auth_value)
-        py_dict = {f: "present" for f in py_fields}
+        py_dict = _parse_didwba(py_auth_value)
         
         print(f"✓ Python JSON fields: {list(py_dict.keys())}")
         
-        # Go 生成
-        result = subprocess.run(
-            ["go", "run", "examples/identity/basic_header/main.go",
-             "-target", target,
-             "-format", "json"],
-            cwd=self.go_root,
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
+        if go_output is None:
             print("❌ Go generation failed")
             return False
         
-        go_dict = json.loads(result.stdout)
+        go_dict = json.loads(go_output)
         print(f"✓ Go JSON fields: {list(go_dict.keys())}")
         
-        # 比较字段
-        py_fields = set(py_dict.keys())
-        go_fields = set(go_dict.keys())
-        
-        common = py_fields & go_fields
-        py_only = py_fields - go_fields
-        go_only = go_fields - py_fields
+        # 比较字段（仅用于展示）
+        common = py_dict.keys() & go_dict.keys()
+        py_only = py_dict.keys() - go_dict.keys()
+        go_only = go_dict.keys() - py_dict.keys()
         
         print(f"✓ Common fields: {sorted(common)}")
         if py_only:
@@ -167,13 +256,14 @@ class CrossVerifier:
         if go_only:
             print(f"ℹ Go-only fields: {sorted(go_only)}")
         
-        # 验证必需字段都存在
-        required = {'did', 'nonce', 'timestamp', 'signature'}
-        if required.issubset(common):
+        # 验证必需字段都存在（位掩码比较）
+        present = _field_mask(py_dict) & _field_mask(go_dict)
+        if present & _REQUIRED_MASK == _REQUIRED_MASK:
             print("✓ All required fields present in both")
             return True
         else:
-            print(f"❌ Missing required fields in common: {required - common}")
+            missing = {name for name, bit in _FIELD_BITS.items() if _REQUIRED_MASK & bit & ~present}
+            print(f"❌ Missing required fields in common: {missing}")
             return False
     
     def verify_signature_format(self):
@@ -182,45 +272,28 @@ class CrossVerifier:
         
         target = "https://test.example.com/api"
         
-        # Python 签名
-        py_auth = DIDWbaAuthHeader(
-            did_document_path=str(self.did_doc),
-            private_key_path=str(self.private_key),
-        )
-        py_header = py_auth.get_auth_header(target)
-        py_auth_value = py_header["Authorization"]
+        py_auth_value, go_output = self._get_headers(target, "json")
         
         # 提取签名
-        import re
-        match = re.search(r'signature="([^"]*)"', py_auth_value)
-        if not match:
+        py_sig = _parse_didwba(py_auth_value).get("signature")
+        if not py_sig:
             print("❌ Cannot extract Python signature")
             return False
-        py_sig = match.group(1)
         
         print(f"✓ Python signature: {py_sig[:30]}... (len={len(py_sig)})")
         
         # Go 签名
-        result = subprocess.run(
-            ["go", "run", "examples/identity/basic_header/main.go",
-             "-target", target,
-             "-format", "json"],
-            cwd=self.go_root,
-            capture_output=True,
-            text=True
-        )
+        if go_output is None:
+            print("❌ Go generation failed")
+            return False
         
-        go_dict = json.loads(result.stdout)
-        go_sig = go_dict['signature']
+        go_sig = json.loads(go_output)['signature']
         
         print(f"✓ Go signature: {go_sig[:30]}... (len={len(go_sig)})")
         
         # 验证签名格式（base64url，不含 padding）
-        import re
-        base64url_pattern = re.compile(r'^[A-Za-z0-9_-]+$')
-        
-        py_valid = base64url_pattern.match(py_sig) is not None
-        go_valid = base64url_pattern.match(go_sig) is not None
+        py_valid = _B64URL_RE.match(py_sig) is not None
+        go_valid = _B64URL_RE.match(go_sig) is not None
         
         if py_valid and go_valid:
             print("✓ Both use valid base64url encoding")
@@ -235,11 +308,8 @@ class CrossVerifier:
         
         target = "https://test.example.com/api"
         
-        # Python 生成两次
-        py_auth = DIDWbaAuthHeader(
-            did_document_path=str(self.did_doc),
-            private_key_path=str(self.private_key),
-        )
+        # Python 生成两次（需要新的 nonce，不走 _get_headers 缓存）
+        py_auth = self.py_auth
         
         py_header1 = py_auth.get_auth_header(target)["Authorization"]
         import time
@@ -251,24 +321,14 @@ class CrossVerifier:
         else:
             print("⚠ Python: Headers are identical")
         
-        # Go 生成两次
-        result1 = subprocess.run(
-            ["go", "run", "examples/identity/basic_header/main.go",
-             "-target", target, "-format", "json"],
-            cwd=self.go_root,
-            capture_output=True,
-            text=True
-        )
-        result2 = subprocess.run(
-            ["go", "run", "examples/identity/basic_header/main.go",
-             "-target", target, "-format", "json"],
-            cwd=self.go_root,
-            capture_output=True,
-            text=True
+        # Go 生成两次（单个进程输出多行 JSON）
+        result = _run(
+            [self.basic_header_bin,
+             "-target", target, "-format", "json", "-count", "2"],
+            self.go_root,
         )
         
-        go_json1 = json.loads(result1.stdout)
-        go_json2 = json.loads(result2.stdout)
+        go_json1, go_json2 = [json.loads(line) for line in result.stdout.splitlines()]
         
         if go_json1['nonce'] != go_json2['nonce']:
             print("✓ Go: Each generation has unique nonce")
@@ -276,11 +336,10 @@ class CrossVerifier:
             print("⚠ Go: Nonces are identical")
         
         # 验证 DID 字段都存在
-        import re
-        py_did1 = re.search(r'did="([^"]*)"', py_header1)
-        py_did2 = re.search(r'did="([^"]*)"', py_header2)
+        py_did1 = _parse_didwba(py_header1).get("did")
+        py_did2 = _parse_didwba(py_header2).get("did")
         
-        if py_did1 and py_did2 and py_did1.group(1) == py_did2.group(1) and go_json1['did'] == go_json2['did']:
+        if py_did1 and py_did1 == py_did2 and go_json1['did'] == go_json2['did']:
             print("✓ DIDs remain consistent across generations")
             return True
         else:
@@ -310,6 +369,9 @@ def main():
     except FileNotFoundError as e:
         print(f"❌ {e}")
         sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Go build failed: {' '.join(e.cmd)}")
+        sys.exit(1)
     
     # 运行验证
     results = []
@@ -322,13 +384,18 @@ def main():
         ("Multiple Generations", verifier.verify_multiple_generations),
     ]
     
-    for name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((name, result))
-        except Exception as e:
-            print(f"❌ Test '{name}' failed with error: {e}")
-            results.append((name, False))
+    # 各验证互不依赖，并发运行；按原顺序输出
+    stdout = _ThreadStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [executor.submit(stdout.run, name, test_func) for name, test_func in tests]
+            for (name, _), future in zip(tests, futures):
+                result, output = future.result()
+                print(output, end="")
+                results.append((name, result))
+    finally:
+        sys.stdout = stdout._stream
     
     # 总结
     print("\n" + "=" * 60)
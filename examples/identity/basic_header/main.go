@@ -16,14 +16,20 @@ func main() {
 		privatePath string
 		target      string
 		format      string
+		count       int
 	)
 
 	flag.StringVar(&didDocPath, "doc", "examples/did_public/public-did-doc.json", "Path to DID document")
 	flag.StringVar(&privatePath, "key", "examples/did_public/public-private-key.pem", "Path to private key")
 	flag.StringVar(&target, "target", "https://agent-connect.ai/api", "Service domain/URL")
 	flag.StringVar(&format, "format", "header", "Output format: header or json")
+	flag.IntVar(&count, "count", 1, "Number of headers to generate, one per line")
 	flag.Parse()
 
+	if count < 1 {
+		log.Fatalf("count must be positive: %d", count)
+	}
+
 	wd, err := os.Getwd()
 	if err != nil {
 		log.Fatalf("get working directory: %v", err)
@@ -43,24 +49,27 @@ func main() {
 		log.Fatalf("create authenticator: %v", err)
 	}
 
-	switch format {
-	case "header":
-		header, err := auth.GenerateHeader(target)
-		if err != nil {
-			log.Fatalf("generate header: %v", err)
-		}
-		fmt.Println("Authorization header:", header["Authorization"])
-	case "json":
-		payload, err := auth.GenerateJSON(target)
-		if err != nil {
-			log.Fatalf("generate json: %v", err)
-		}
-		bytes, err := payload.Marshal()
-		if err != nil {
-			log.Fatalf("marshal json: %v", err)
+	for i := 0; i < count; i++ {
+		switch format {
+		case "header":
+			// Force a fresh header so repeated generations do not hit the cache.
+			header, err := auth.GenerateHeaderForce(target)
+			if err != nil {
+				log.Fatalf("generate header: %v", err)
+			}
+			fmt.Println("Authorization header:", header["Authorization"])
+		case "json":
+			payload, err := auth.GenerateJSON(target)
+			if err != nil {
+				log.Fatalf("generate json: %v", err)
+			}
+			bytes, err := payload.Marshal()
+			if err != nil {
+				log.Fatalf("marshal json: %v", err)
+			}
+			fmt.Println(string(bytes))
+		default:
+			log.Fatalf("unknown format: %s", format)
 		}
-		fmt.Println(string(bytes))
-	default:
-		log.Fatalf("unknown format: %s", format)
 	}
 }
@@ -0,0 +1,46 @@
+"""Artifact loaders shared by verify_helper.py and compare_artifacts.py.
+
+Kept free of sys.path side effects so importing it does not change which
+``anp`` package the importer resolves.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Tuple
+
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+
+def load_json(path: Path) -> Dict:
+    with open(path, "rb") as handle:
+        return _loads(handle.read())
+
+
+def load_required_artifacts(header_file: Path, params_file: Path) -> Tuple[str, Dict]:
+    header_data = load_json(header_file)
+    auth_header = header_data.get("auth_header")
+    if not auth_header:
+        raise ValueError(f"{header_file} does not contain auth_header")
+
+    params = load_json(params_file)
+    return auth_header, params
+
+
+def load_inputs(
+    header_file: Path,
+    params_file: Path,
+    did_doc: Path,
+    service_domain: str | None = None,
+) -> Tuple[str, Dict, str]:
+    auth_header, params = load_required_artifacts(header_file, params_file)
+    service_domain = service_domain or params.get("service_domain")
+    if not service_domain:
+        raise ValueError("Service domain is not present in params and no override was provided.")
+
+    did_document = load_json(did_doc)
+    return auth_header, did_document, service_domain
@@ -13,9 +13,13 @@ import argparse
 import json
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Sequence
 
+from artifact_loader import load_inputs
+
 SCRIPT_DIR = Path(__file__).parent
 GO_ROOT = SCRIPT_DIR.parent.parent
 VERIFY_HELPER = SCRIPT_DIR / "verify_helper.go"
@@ -26,6 +30,117 @@ try:
 except Exception:
     create_did_wba_document = None
 
+# verify_helper.py puts this root first on sys.path, so its anp wins there.
+ANP_ROOT = SCRIPT_DIR.parent.parent.parent
+
+
+def _load_in_process_verifier() -> tuple[object | None, str]:
+    """Return anp's verifier only if it is the anp verify_helper.py would load.
+
+    Otherwise python→* checks fall back to the verify_helper.py daemon, so both
+    paths always exercise the same implementation. Also returns a description
+    of the implementation in use.
+    """
+    fallback = f"verify_helper.py daemon (anp resolved with {ANP_ROOT} first on sys.path)"
+    try:
+        import anp
+        from anp.authentication.did_wba import verify_auth_header_signature as verify
+    except Exception:
+        return None, fallback
+
+    anp_dir = Path(next(iter(anp.__path__))).resolve()
+    local_anp = (ANP_ROOT / "anp").resolve()
+    if local_anp.is_dir() and anp_dir != local_anp:
+        return None, f"{fallback}; in-process anp at {anp_dir} differs"
+    return verify, f"in-process anp at {anp_dir}"
+
+
+verify_auth_header_signature, PY_VERIFIER_SOURCE = _load_in_process_verifier()
+
+
+class VerifierExited(RuntimeError):
+    def __init__(self, returncode: int, stderr: str = "") -> None:
+        message = f"verifier exited with code {returncode}"
+        if stderr:
+            message = f"{message}: {stderr}"
+        super().__init__(message)
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class VerifierDaemon:
+    """Long-lived verifier process exchanging newline-delimited JSON over stdin/stdout.
+
+    The process is started on first use so its startup cost is paid once per run.
+    Its stderr is collected in the background and reported if the process exits.
+    """
+
+    def __init__(self, cmd: Sequence[str], cwd: Path) -> None:
+        self._cmd = list(cmd)
+        self._cwd = cwd
+        self._proc: subprocess.Popen[str] | None = None
+        self._stderr_lines: list[str] = []
+        self._stderr_reader: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> subprocess.Popen[str]:
+        proc = subprocess.Popen(
+            self._cmd,
+            cwd=self._cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        # Drain stderr on a thread so a chatty process cannot block on a full pipe.
+        self._stderr_lines = []
+        self._stderr_reader = threading.Thread(
+            target=self._stderr_lines.extend,
+            args=(proc.stderr,),
+            daemon=True,
+        )
+        self._stderr_reader.start()
+        return proc
+
+    def _exited(self, proc: subprocess.Popen[str]) -> VerifierExited:
+        returncode = proc.wait()
+        if self._stderr_reader is not None:
+            self._stderr_reader.join(timeout=5)
+        return VerifierExited(returncode, "".join(self._stderr_lines).strip())
+
+    def verify(self, params: Path, header: Path, did_doc: Path) -> tuple[bool, str]:
+        request = json.dumps({"params": str(params), "header": str(header), "did_doc": str(did_doc)})
+        with self._lock:
+            if self._proc is None:
+                self._proc = self._start()
+            proc = self._proc
+            try:
+                proc.stdin.write(request + "\n")
+                proc.stdin.flush()
+                line = proc.stdout.readline()
+            except BrokenPipeError:
+                line = ""
+            if not line:
+                raise self._exited(proc)
+
+        response = json.loads(line)
+        return response["ok"], response["msg"]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._proc is None:
+                return
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            self._proc.wait()
+            self._proc = None
+
+
+GO_VERIFIER = VerifierDaemon(("go", "run", str(VERIFY_HELPER), "-daemon"), GO_ROOT)
+PY_VERIFIER = VerifierDaemon((sys.executable, str(PY_VERIFY_HELPER), "--daemon"), SCRIPT_DIR)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -107,10 +222,18 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+# Paths already seen to exist. Only hits are remembered, since generators may
+# create a path between checks.
+_EXISTING_PATHS: set[Path] = set()
+
+
 def ensure_exists(path: Path) -> bool:
+    if path in _EXISTING_PATHS:
+        return True
     if not path.exists():
         print(f"[missing] {path}")
         return False
+    _EXISTING_PATHS.add(path)
     return True
 
 
@@ -148,14 +271,10 @@ def generate_did_material(
 
 
 def run_command(label: str, cmd: Sequence[str], cwd: Path) -> bool:
-    result = subprocess.run(
-        cmd,
-        cwd=cwd,
-        capture_output=True,
-        text=True,
-    )
-    stdout = result.stdout.strip()
-    stderr = result.stderr.strip()
+    result = subprocess.run(cmd, cwd=cwd, capture_output=True)
+    # Both streams are printed, so keep them; decode as UTF-8 rather than via the locale.
+    stdout = result.stdout.strip().decode("utf-8", "replace")
+    stderr = result.stderr.strip().decode("utf-8", "replace")
 
     if stdout:
         print(f"[{label}] {stdout}")
@@ -169,68 +288,59 @@ def run_command(label: str, cmd: Sequence[str], cwd: Path) -> bool:
 
 
 def run_go_verify(label: str, params: Path, header: Path, did_doc: Path) -> bool:
-    cmd: Sequence[str] = (
-        "go",
-        "run",
-        str(VERIFY_HELPER),
-        "-params",
-        str(params),
-        "-header",
-        str(header),
-        "-did-doc",
-        str(did_doc),
-    )
-    result = subprocess.run(
-        cmd,
-        cwd=GO_ROOT,
-        capture_output=True,
-        text=True,
-    )
-    stdout = result.stdout.strip()
-    stderr = result.stderr.strip()
+    try:
+        ok, message = GO_VERIFIER.verify(params, header, did_doc)
+    except VerifierExited as exc:
+        print(f"[fail] {label}: {exc}")
+        return False
 
-    if result.returncode == 0:
-        message = stdout or "verification succeeded"
-        print(f"[ok] {label}: {message}")
+    if ok:
+        print(f"[ok] {label}: {message or 'verification succeeded'}")
         return True
 
-    problem = stderr or stdout or "unknown failure"
-    print(f"[fail] {label}: {problem}")
+    print(f"[fail] {label}: {message or 'unknown failure'}")
     return False
 
 
 def run_python_verify(label: str, params: Path, header: Path, did_doc: Path) -> bool:
-    cmd: Sequence[str] = (
-        sys.executable,
-        str(PY_VERIFY_HELPER),
-        "--params-file",
-        str(params),
-        "--header-file",
-        str(header),
-        "--did-doc",
-        str(did_doc),
-    )
-    result = subprocess.run(
-        cmd,
-        cwd=SCRIPT_DIR,
-        capture_output=True,
-        text=True,
-    )
-    stdout = result.stdout.strip()
-    stderr = result.stderr.strip()
+    if verify_auth_header_signature is None:
+        return run_python_verify_daemon(label, params, header, did_doc)
+
+    try:
+        auth_header, did_document, service_domain = load_inputs(header, params, did_doc)
+    except Exception as exc:
+        print(f"[fail] {label}: Failed to load artifacts: {exc}")
+        return False
+
+    try:
+        ok, message = verify_auth_header_signature(auth_header, did_document, service_domain)
+    except Exception as exc:
+        print(f"[fail] {label}: Verifier raised: {exc}")
+        return False
 
-    if result.returncode == 0:
-        message = stdout or "verification succeeded"
-        print(f"[ok] {label}: {message}")
+    if ok:
+        print(f"[ok] {label}: {message or 'verification succeeded'}")
         return True
 
-    if result.returncode == 2:
-        note = stderr or stdout or "python verifier unavailable"
-        print(f"[skip] {label}: {note}")
+    print(f"[fail] {label}: {message or 'unknown failure'}")
+    return False
+
+
+def run_python_verify_daemon(label: str, params: Path, header: Path, did_doc: Path) -> bool:
+    try:
+        ok, message = PY_VERIFIER.verify(params, header, did_doc)
+    except VerifierExited as exc:
+        if exc.returncode == 2:
+            print(f"[skip] {label}: {exc.stderr or 'python verifier unavailable'}")
+        else:
+            print(f"[fail] {label}: {exc}")
         return False
 
-    problem = stderr or stdout or "unknown failure"
-    print(f"[fail] {label}: {problem}")
+    if ok:
+        print(f"[ok] {label}: {message or 'verification succeeded'}")
+        return True
+
+    print(f"[fail] {label}: {message or 'unknown failure'}")
     return False
 
 
@@ -317,12 +427,23 @@ def main() -> None:
     if not all(ensure_exists(path) for path in required):
         sys.exit(1)
 
-    ok_go_go = run_go_verify("go→go", go_params, go_header, did_doc)
-    ok_go_py = run_go_verify("go→python", py_params, py_header, did_doc)
-    ok_py_go = run_python_verify("python→go", go_params, go_header, did_doc)
-    ok_py_py = run_python_verify("python→python", py_params, py_header, did_doc)
+    print(f"[info] python verifier: {PY_VERIFIER_SOURCE}")
+
+    # The four verifications are independent; run them concurrently.
+    # Each verifier daemon serializes its own requests.
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(run_go_verify, "go→go", go_params, go_header, did_doc),
+                executor.submit(run_go_verify, "go→python", py_params, py_header, did_doc),
+                executor.submit(run_python_verify, "python→go", go_params, go_header, did_doc),
+                executor.submit(run_python_verify, "python→python", py_params, py_header, did_doc),
+            ]
+            all_ok = all([future.result() for future in futures])
+    finally:
+        GO_VERIFIER.close()
+        PY_VERIFIER.close()
 
-    all_ok = ok_go_go and ok_go_py and ok_py_go and ok_py_py
     if all_ok:
         sys.exit(0)
     sys.exit(1)
@@ -1,46 +1,94 @@
 #!/usr/bin/env python3
-"""Generate DID-WBA artifacts with the Python toolchain."""
+"""Generate DID-WBA artifacts with the Python toolchain.
+
+jcs and cryptography are imported on first use to keep startup cheap.
+"""
+
+from __future__ import annotations
 
 import argparse
 import base64
+import functools
 import hashlib
 import json
 import sys
-import uuid
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import jcs  # type: ignore
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import ec, utils
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.asymmetric import ec
 
+try:
+    import orjson
+
+    def _dumps(data: dict) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(data: dict) -> bytes:
+        return json.dumps(data, indent=2).encode("utf-8")
+
+    _loads = json.loads
 
-def extract_domain(url: str) -> str:
-    if url.startswith("https://"):
-        url = url[8:]
-    elif url.startswith("http://"):
-        url = url[7:]
 
-    for char in ("/", ":"):
-        idx = url.find(char)
+def extract_domain(url: str) -> str:
+    offset = 8 if url.startswith("https://") else 7 if url.startswith("http://") else 0
+    end = len(url)
+    for char in "/:":
+        idx = url.find(char, offset, end)
         if idx != -1:
-            return url[:idx]
-    return url
+            end = idx
+    return url[offset:end]
 
 
-def load_private_key(path: Path) -> ec.EllipticCurvePrivateKey:
+@functools.lru_cache(maxsize=16)
+def _load_private_key(path: str, mtime: float) -> ec.EllipticCurvePrivateKey:
+    from cryptography.hazmat.primitives import serialization
+
     with open(path, "rb") as handle:
         return serialization.load_pem_private_key(handle.read(), password=None)
 
 
+def load_private_key(path: Path) -> ec.EllipticCurvePrivateKey:
+    # Keyed on mtime so an updated PEM is parsed again.
+    resolved = Path(path).resolve()
+    return _load_private_key(str(resolved), resolved.stat().st_mtime)
+
+
+_B64URL_TABLE = bytes.maketrans(b"+/", b"-_")
+
+
 def base64url_encode(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+    return base64.b64encode(data).translate(_B64URL_TABLE).rstrip(b"=").decode("ascii")
+
+
+_CANONICAL_KEYS = frozenset(("did", "nonce", "service", "timestamp"))
+
+
+def canonicalize_payload(payload: dict) -> bytes:
+    # For the fixed auth payload (ASCII keys, string values) sorted compact JSON
+    # is byte-identical to JCS; anything else goes through jcs.
+    if payload.keys() == _CANONICAL_KEYS and all(isinstance(v, str) for v in payload.values()):
+        return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    import jcs  # type: ignore
+
+    return jcs.canonicalize(payload)
 
 
 def sign_payload(private_key: ec.EllipticCurvePrivateKey, payload: dict) -> str:
-    canonical = jcs.canonicalize(payload)
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec, utils
+
+    canonical = canonicalize_payload(payload)
     digest = hashlib.sha256(canonical).digest()
 
+    # The digest is signed as the message, so ECDSA hashes it a second time.
+    # This matches go_generator.go (finalDigest = sha256(sha256(canonical)))
+    # and the Python anp verifier; utils.Prehashed would break that parity.
     signature_der = private_key.sign(digest, ec.ECDSA(hashes.SHA256()))
     r, s = utils.decode_dss_signature(signature_der)
     size = (private_key.curve.key_size + 7) // 8
@@ -48,9 +96,12 @@ def sign_payload(private_key: ec.EllipticCurvePrivateKey, payload: dict) -> str:
     return base64url_encode(signature)
 
 
-def write_json(path: Path, data: dict) -> None:
-    with open(path, "w", encoding="utf-8") as handle:
-        json.dump(data, handle, indent=2)
+def write_json_files(files: dict[Path, dict]) -> None:
+    # Serialize everything first so a failure leaves no partial artifact set.
+    encoded = [(path, _dumps(data)) for path, data in files.items()]
+    for path, payload in encoded:
+        with open(path, "wb") as handle:
+            handle.write(payload)
 
 
 def generate_artifacts(
@@ -63,10 +114,15 @@ def generate_artifacts(
 ) -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    did_doc = json.loads(Path(did_doc_path).read_text(encoding="utf-8"))
+    did_doc = _loads(Path(did_doc_path).read_bytes())
     private_key = load_private_key(private_key_path)
 
-    nonce = fixed_nonce or uuid.uuid4().hex
+    if fixed_nonce:
+        nonce = fixed_nonce
+    else:
+        import uuid
+
+        nonce = uuid.uuid4().hex
     timestamp = fixed_timestamp or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     service_domain = extract_domain(target_url)
 
@@ -98,7 +154,6 @@ def generate_artifacts(
         "verification_method_id": verification_method_id,
         "service_domain": service_domain,
     }
-    write_json(output_dir / "py_step1_params.json", step1)
     print("✓ Step 1: Parameters generated")
 
     payload = {
@@ -118,9 +173,15 @@ def generate_artifacts(
         f'verification_method="{step1["verification_method"]}", '
         f'signature="{signature_base64url}"'
     )
-    write_json(output_dir / "py_step4_header.json", {"auth_header": header})
     print("✓ Step 4: Auth header assembled")
 
+    write_json_files(
+        {
+            output_dir / "py_step1_params.json": step1,
+            output_dir / "py_step4_header.json": {"auth_header": header},
+        }
+    )
+
     print("\n✅ Python artifacts generated successfully")
 
 
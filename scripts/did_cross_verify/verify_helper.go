@@ -1,9 +1,11 @@
 package main
 
 import (
+	"bufio"
 	"encoding/json"
 	"flag"
 	"fmt"
+	"io"
 	"log"
 	"os"
 	"regexp"
@@ -21,6 +23,19 @@ type paramsArtifact struct {
 	VerificationMethod string `json:"verification_method"`
 }
 
+// verifyRequest is one newline-delimited request read in -daemon mode.
+type verifyRequest struct {
+	Header        string `json:"header"`
+	Params        string `json:"params"`
+	DIDDoc        string `json:"did_doc"`
+	ServiceDomain string `json:"service_domain,omitempty"`
+}
+
+type verifyResponse struct {
+	OK      bool   `json:"ok"`
+	Message string `json:"msg"`
+}
+
 var headerPattern = regexp.MustCompile(`(did|nonce|timestamp|verification_method|signature)="([^"]*)"`)
 
 type parsedHeader struct {
@@ -38,38 +53,81 @@ func main() {
 	paramsPath := flag.String("params", "", "Path to step1 parameters JSON")
 	didDocPath := flag.String("did-doc", "", "Path to DID document JSON")
 	overrideDomain := flag.String("service-domain", "", "Override service domain (optional)")
+	daemon := flag.Bool("daemon", false, "Serve newline-delimited JSON requests on stdin")
 	flag.Parse()
 
-	if *headerPath == "" || *paramsPath == "" || *didDocPath == "" {
-		log.Fatalf("header, params, and did-doc arguments are required")
+	if *daemon {
+		if err := serve(os.Stdin, os.Stdout); err != nil {
+			log.Fatalf("daemon: %v", err)
+		}
+		return
+	}
+
+	message, err := verifyArtifacts(*headerPath, *paramsPath, *didDocPath, *overrideDomain)
+	if err != nil {
+		log.Fatal(err)
+	}
+	fmt.Println(message)
+}
+
+// serve answers one JSON response line per request line until in is exhausted.
+func serve(in io.Reader, out io.Writer) error {
+	scanner := bufio.NewScanner(in)
+	encoder := json.NewEncoder(out)
+	for scanner.Scan() {
+		if len(scanner.Bytes()) == 0 {
+			continue
+		}
+
+		var resp verifyResponse
+		var req verifyRequest
+		if err := json.Unmarshal(scanner.Bytes(), &req); err != nil {
+			resp.Message = fmt.Sprintf("invalid request: %v", err)
+		} else if message, err := verifyArtifacts(req.Header, req.Params, req.DIDDoc, req.ServiceDomain); err != nil {
+			resp.Message = err.Error()
+		} else {
+			resp.OK = true
+			resp.Message = message
+		}
+
+		if err := encoder.Encode(resp); err != nil {
+			return err
+		}
+	}
+	return scanner.Err()
+}
+
+func verifyArtifacts(headerPath, paramsPath, didDocPath, overrideDomain string) (string, error) {
+	if headerPath == "" || paramsPath == "" || didDocPath == "" {
+		return "", fmt.Errorf("header, params, and did-doc arguments are required")
 	}
 
-	headerData, err := loadHeader(*headerPath)
+	headerData, err := loadHeader(headerPath)
 	if err != nil {
-		log.Fatalf("failed to load header artifact: %v", err)
+		return "", fmt.Errorf("failed to load header artifact: %w", err)
 	}
 
-	params, err := loadParams(*paramsPath)
+	params, err := loadParams(paramsPath)
 	if err != nil {
-		log.Fatalf("failed to load parameter artifact: %v", err)
+		return "", fmt.Errorf("failed to load parameter artifact: %w", err)
 	}
 
 	serviceDomain := params.ServiceDomain
-	if *overrideDomain != "" {
-		serviceDomain = *overrideDomain
+	if overrideDomain != "" {
+		serviceDomain = overrideDomain
 	}
 	if serviceDomain == "" {
-		log.Fatalf("service domain not provided in params and no override specified")
+		return "", fmt.Errorf("service domain not provided in params and no override specified")
 	}
 
-	doc, err := loadDidDocument(*didDocPath)
+	doc, err := loadDidDocument(didDocPath)
 	if err != nil {
-		log.Fatalf("failed to load DID document: %v", err)
+		return "", fmt.Errorf("failed to load DID document: %w", err)
 	}
 
 	headerParts, err := parseHeader(headerData.AuthHeader)
 	if err != nil {
-		log.Fatalf("invalid auth header: %v", err)
+		return "", fmt.Errorf("invalid auth header: %w", err)
 	}
 
 	authJSON := anp_auth.AuthJSON{
@@ -82,14 +140,13 @@ func main() {
 
 	ok, message := anp_auth.VerifyAuthJSON(&authJSON, doc, serviceDomain)
 	if !ok {
-		log.Fatalf("verification failed: %s", message)
+		return "", fmt.Errorf("verification failed: %s", message)
 	}
 
-	if message != "" {
-		fmt.Println(message)
-	} else {
-		fmt.Println("Verification succeeded")
+	if message == "" {
+		message = "Verification succeeded"
 	}
+	return message, nil
 }
 
 func loadHeader(path string) (*headerArtifact, error) {
@@ -7,52 +7,71 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Dict, Tuple
+
+from artifact_loader import load_inputs
 
 SCRIPT_DIR = Path(__file__).parent
 ANP_ROOT = SCRIPT_DIR.parent.parent.parent
 sys.path.insert(0, str(ANP_ROOT))
 
 
-def load_json(path: Path) -> Dict:
-    with open(path, "r", encoding="utf-8") as handle:
-        return json.load(handle)
-
-
-def load_required_artifacts(header_file: Path, params_file: Path) -> Tuple[str, Dict]:
-    header_data = load_json(header_file)
-    auth_header = header_data.get("auth_header")
-    if not auth_header:
-        raise ValueError(f"{header_file} does not contain auth_header")
-
-    params = load_json(params_file)
-    return auth_header, params
+def serve(verify_auth_header_signature) -> int:
+    """Answer newline-delimited JSON requests from stdin until EOF."""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            auth_header, did_document, service_domain = load_inputs(
+                Path(request["header"]),
+                Path(request["params"]),
+                Path(request["did_doc"]),
+                request.get("service_domain"),
+            )
+        except Exception as exc:
+            ok, message = False, f"Failed to load artifacts: {exc}"
+        else:
+            # A verifier crash must fail only this request, not the daemon.
+            try:
+                ok, message = verify_auth_header_signature(auth_header, did_document, service_domain)
+            except Exception as exc:
+                ok, message = False, f"Verifier raised: {exc}"
+        print(json.dumps({"ok": ok, "msg": message}), flush=True)
+    return 0
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Verify DID-WBA header using Python implementation.")
-    parser.add_argument("--header-file", required=True)
-    parser.add_argument("--params-file", required=True)
-    parser.add_argument("--did-doc", required=True)
+    parser.add_argument("--header-file")
+    parser.add_argument("--params-file")
+    parser.add_argument("--did-doc")
     parser.add_argument("--service-domain")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Serve newline-delimited JSON requests on stdin instead of a single verification.",
+    )
     args = parser.parse_args()
 
+    if not args.daemon and not (args.header_file and args.params_file and args.did_doc):
+        parser.error("--header-file, --params-file and --did-doc are required")
+
     try:
         from anp.authentication.did_wba import verify_auth_header_signature
     except Exception as exc:  # pragma: no cover - depends on optional deps
-        print(f"Dependencies missing for Python verifier: {exc}")
+        print(f"Dependencies missing for Python verifier: {exc}", file=sys.stderr if args.daemon else sys.stdout)
         return 2
 
+    if args.daemon:
+        return serve(verify_auth_header_signature)
+
     try:
-        auth_header, params = load_required_artifacts(
+        auth_header, did_document, service_domain = load_inputs(
             Path(args.header_file),
             Path(args.params_file),
+            Path(args.did_doc),
+            args.service_domain,
         )
-        service_domain = args.service_domain or params.get("service_domain")
-        if not service_domain:
-            raise ValueError("Service domain is not present in params and no override was provided.")
-
-        did_document = load_json(Path(args.did_doc))
     except Exception as exc:
         print(f"Failed to load artifacts: {exc}")
         return 1